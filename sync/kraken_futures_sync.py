@@ -1,16 +1,40 @@
 import os
+import re
+import sys
 import json
 import csv
 import time
+import heapq
+import atexit
 import base64
+import functools
 import hmac
-import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from operator import itemgetter
 from pathlib import Path
 
 import requests
+from requests.adapters import HTTPAdapter, Retry
 from dotenv import load_dotenv
 
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    np = None
+    pd = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ciso8601
+except ImportError:
+    ciso8601 = None
+
 # ------------------------------------------------------------
 # CONFIG
 # ------------------------------------------------------------
@@ -26,40 +50,91 @@ BLOFIN_CSV_DEFAULT = Path(__file__).resolve().parent / "blofin_order_history.csv
 
 TIMEOUT = 30
 
+# Interned constants for the row dicts: every row shares one canonical
+# object per label instead of a fresh string slot.
+EX_KRAKEN = sys.intern("KRAKEN")
+EX_BLOFIN = sys.intern("BLOFIN")
+MKT_FUTURES = sys.intern("FUTURES")
+SIDE_BUY = sys.intern("BUY")
+SIDE_SELL = sys.intern("SELL")
+NOTES_KRAKEN = sys.intern("Kraken Futures account-log")
+NOTES_BLOFIN = sys.intern("Blofin order history")
+
+# One keep-alive session for all Kraken calls: the endpoints hit the same
+# host back-to-back, so reusing the connection skips a TCP+TLS handshake
+# per request.
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    "User-Agent": "pnl-traden-sync/1.0",
+    "Accept": "application/json",
+})
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+    ),
+))
+atexit.register(_SESSION.close)
+
 
 # ------------------------------------------------------------
 # Helpers
 # ------------------------------------------------------------
+_UTC = timezone.utc
+
+
 def now_utc_iso() -> str:
-    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    # Emit the fixed-width second-resolution form directly — no
+    # isoformat allocation followed by a "+00:00" -> "Z" patch.
+    n = datetime.now(_UTC)
+    return f"{n.year:04d}-{n.month:02d}-{n.day:02d}T{n.hour:02d}:{n.minute:02d}:{n.second:02d}Z"
+
+
+# Plain numeric cell, the overwhelmingly common case in the exports.
+_PLAIN_NUM_RE = re.compile(r"^-?\d+(?:\.\d+)?$")
+# First numeric token in a messy cell ("2.175 USDT", "1,23", ...).
+_NUM_TOKEN_RE = re.compile(r"[-+]?\d*[.,]?\d+")
+_COMMA_TBL = str.maketrans({",": "."})
+_SENTINELS = {"", "--", "—"}
 
 
 def num(x) -> float:
     if x is None:
         return 0.0
+    # already numeric (pre-coerced cells): no str round-trip, NaN -> 0.0
+    if isinstance(x, (int, float)):
+        return 0.0 if x != x else float(x)
     s = str(x).strip()
-    if s in ("", "--", "—"):
+    if s in _SENTINELS:
+        return 0.0
+    # fast path for clean numeric strings
+    if _PLAIN_NUM_RE.match(s):
+        return float(s)
+    # one C-level regex scan instead of a Python loop per character;
+    # a trailing comma decimal (1,23) becomes a dot before float()
+    m = _NUM_TOKEN_RE.search(s)
+    if not m:
         return 0.0
-    # 1,23 -> 1.23
-    if "," in s and "." not in s:
-        s = s.replace(",", ".")
-    # strip currency tokens like "2.175 USDT"
-    # keep first numeric
-    out = []
-    seen_digit = False
-    for ch in s:
-        if ch.isdigit() or ch in ".-":
-            out.append(ch)
-            if ch.isdigit():
-                seen_digit = True
-        elif seen_digit:
-            break
     try:
-        return float("".join(out)) if out else 0.0
-    except Exception:
+        return float(m.group(0).translate(_COMMA_TBL))
+    except ValueError:
         return 0.0
 
 
+def sort_rows_by_datetime(rows: list[dict]) -> None:
+    """
+    Sort rows in place by datetime, skipping the sort entirely when the
+    input is already in order (exports usually are). The monotonicity
+    scan is O(n) and short-circuits on the first out-of-order pair.
+    """
+    dts = [r.get("datetime", "") for r in rows]
+    if any(a > b for a, b in zip(dts, dts[1:])):
+        rows.sort(key=itemgetter("datetime"))
+
+
 def write_json(rows: list, extra: dict):
     OUT_FILE.parent.mkdir(parents=True, exist_ok=True)
     payload = {
@@ -68,7 +143,23 @@ def write_json(rows: list, extra: dict):
         "counts": {"rows": len(rows)},
         **extra,
     }
-    OUT_FILE.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    # Write to a sibling temp file and os.replace it in: the rename is
+    # atomic, so a crash mid-write can never leave a truncated pnl.json
+    # for the site to serve.
+    tmp = OUT_FILE.with_name(OUT_FILE.name + ".tmp")
+    if orjson is not None:
+        # orjson serializes (and indents) in C and hands back bytes
+        # directly; OPT_SERIALIZE_NUMPY covers numpy scalars coming out
+        # of the pandas loader.
+        tmp.write_bytes(
+            orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        )
+    else:
+        # json.dump streams into the file handle instead of building the
+        # whole document as one string first.
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, OUT_FILE)
     print(f"Wrote: {OUT_FILE}")
     print(f"Rows: {len(rows)}")
 
@@ -76,26 +167,219 @@ def write_json(rows: list, extra: dict):
 # ------------------------------------------------------------
 # Kraken account-log CSV -> rows (ACCURATE)
 # ------------------------------------------------------------
+# The account log only contains a dozen-odd distinct type strings, so
+# classify each raw value once and reuse the result for every repeat.
+_TYPE_CACHE: dict[str, tuple[bool, bool, str]] = {}
+
+
+def _classify_type(raw: str) -> tuple[bool, bool, str]:
+    """(is_trade, is_funding, side) for a raw account-log type cell."""
+    hit = _TYPE_CACHE.get(raw)
+    if hit is None:
+        t = raw.strip().lower()
+        hit = ("futures trade" in t, "funding" in t, raw.upper())
+        _TYPE_CACHE[raw] = hit
+    return hit
+
+
+def _parse_iso_dt(s: str) -> datetime:
+    # ciso8601 is a C extension that parses ISO 8601 (including the
+    # space-separated variant and trailing Z) far faster than
+    # fromisoformat; fall back to stdlib when it is not installed.
+    if ciso8601 is not None:
+        return ciso8601.parse_datetime(s)
+    return datetime.fromisoformat(s.replace("Z", "+00:00"))
+
+
+_MONTHS = {
+    "Jan": 1, "Feb": 2, "Mar": 3, "Apr": 4, "May": 5, "Jun": 6,
+    "Jul": 7, "Aug": 8, "Sep": 9, "Oct": 10, "Nov": 11, "Dec": 12,
+}
+
+# Slash-format strptime patterns per exchange; the cached parser below
+# handles the fast path and the ISO branch for both.
+_KRAKEN_SLASH_FMT = "%d/%b/%Y %H:%M:%S"  # 11/Jan/2026 21:24:14
+_BLOFIN_SLASH_FMT = "%m/%d/%Y %H:%M:%S"  # 01/09/2026 06:40:54
+
+# Day cap per month (index 1-12); February holds 29 and the leap-year
+# check below tightens it for non-leap years.
+_DAYS_IN_MONTH = (0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _format_slash_direct(s: str, fmt: str) -> str | None:
+    """
+    Emit the ISO string straight from a fixed-width slash timestamp,
+    without building a datetime. Returns None when the input does not
+    match, so the caller can fall back to strptime.
+    """
+    try:
+        if fmt is _KRAKEN_SLASH_FMT:
+            if len(s) != 20 or not s[3:6].isalpha():
+                return None
+            d = int(s[0:2])
+            mon = _MONTHS[s[3:6]]
+            y = int(s[7:11])
+            h, mi, sec = int(s[12:14]), int(s[15:17]), int(s[18:20])
+        else:
+            if len(s) != 19:
+                return None
+            mon = int(s[0:2])
+            d = int(s[3:5])
+            y = int(s[6:10])
+            h, mi, sec = int(s[11:13]), int(s[14:16]), int(s[17:19])
+        if (
+            1 <= mon <= 12
+            and 1 <= d <= _DAYS_IN_MONTH[mon]
+            and h < 24 and mi < 60 and sec < 60
+            and not (mon == 2 and d == 29 and (y % 4 or (y % 100 == 0 and y % 400)))
+        ):
+            return f"{y:04d}-{mon:02d}-{d:02d}T{h:02d}:{mi:02d}:{sec:02d}Z"
+    except (ValueError, KeyError):
+        pass
+    return None
+
+
+# Trade/fee/funding splits repeat the same timestamp string many times,
+# so successful parses are memoized. Blank cells and parse failures stay
+# outside the cache — their now_utc_iso() fallback must not be frozen.
+@functools.lru_cache(maxsize=16384)
+def _parse_dt_cached(s: str, slash_fmt: str) -> str:
+    # "/" within the first three chars covers non-zero-padded days and
+    # months too (1/9/2026, 1/Jan/2026); ISO strings never match.
+    if len(s) > 5 and "/" in s[:3]:
+        out = _format_slash_direct(s, slash_fmt)
+        if out is not None:
+            return out
+        dt = datetime.strptime(s, slash_fmt)
+        dt = dt.replace(tzinfo=timezone.utc)
+    else:
+        dt = _parse_iso_dt(s)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        dt = dt.astimezone(timezone.utc)
+    return dt.isoformat().replace("+00:00", "Z")
+
+
 def parse_kraken_dt(dt_str: str) -> str:
     """
     Kraken futures log example: 11/Jan/2026 21:24:14
+    Newer exports use ISO: 2026-01-26 23:00:00
     """
     s = (dt_str or "").strip()
     if not s:
         return now_utc_iso()
 
     try:
-        dt = datetime.strptime(s, "%d/%b/%Y %H:%M:%S")
-        dt = dt.replace(tzinfo=timezone.utc)
-        return dt.isoformat().replace("+00:00", "Z")
+        return _parse_dt_cached(s, _KRAKEN_SLASH_FMT)
     except Exception:
-        try:
-            dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=timezone.utc)
-            return dt.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
-        except Exception:
-            return now_utc_iso()
+        return now_utc_iso()
+
+
+# Rows per pandas chunk: keeps the intermediate string/float columns of
+# huge exports from all being resident at once.
+_KRAKEN_CHUNK_ROWS = 200_000
+
+
+def _load_kraken_account_log_pandas(path: Path) -> list[dict]:
+    """
+    Vectorized loader: pandas parses the whole CSV in C, numeric coercion
+    and the pnl/fee/funding arithmetic run as column ops instead of
+    per-row Python. Reads in fixed-size chunks so peak memory is bounded
+    by the chunk, not the file. Same output as the csv fallback below.
+    """
+    records: list[dict] = []
+    try:
+        with pd.read_csv(
+            path,
+            encoding="utf-8-sig",
+            dtype=str,
+            keep_default_na=False,
+            # never infer index columns: a ragged first data row must
+            # raise ParserError (handled below), not shift every column
+            index_col=False,
+            chunksize=_KRAKEN_CHUNK_ROWS,
+        ) as chunks:
+            for df in chunks:
+                records.extend(_kraken_frame_to_records(df))
+    except pd.errors.EmptyDataError:
+        # zero-byte / headerless export: same empty result as the csv
+        # fallback, so the Blofin source still gets processed
+        return []
+    except pd.errors.ParserError:
+        # ragged rows (spillover cells) abort the C parser; the python
+        # loop tolerates them, so reparse this file on the slow path
+        return _load_kraken_account_log_python(path)
+    sort_rows_by_datetime(records)
+    return records
+
+
+def _kraken_frame_to_records(df: "pd.DataFrame") -> list[dict]:
+    if df.empty:
+        return []
+    df.columns = df.columns.str.strip().str.lower()
+
+    def col(name: str) -> "pd.Series":
+        if name in df.columns:
+            return df[name].fillna("")
+        return pd.Series([""] * len(df), index=df.index)
+
+    num_cols = {}
+    for name in ("trade price", "realized pnl", "fee", "realized funding", "change"):
+        raw = col(name)
+        ser = pd.to_numeric(raw, errors="coerce")
+        # cells the C coercion rejects ("100 USDT", "5,5") go through
+        # num() like the csv fallback; clean exports never hit this
+        messy = ser.isna() & (raw != "")
+        if messy.any():
+            ser[messy] = raw[messy].map(num)
+        num_cols[name] = ser.fillna(0.0)
+
+    dt = pd.to_datetime(col("datetime"), format="mixed", utc=True, errors="coerce")
+    dt_iso = dt.dt.strftime("%Y-%m-%dT%H:%M:%SZ").where(dt.notna(), now_utc_iso())
+
+    typ_raw = col("type")
+    typ = typ_raw.str.strip().str.lower()
+    is_trade = typ.str.contains("futures trade", regex=False).to_numpy()
+    is_funding = typ.str.contains("funding", regex=False).to_numpy()
+
+    # Run the arithmetic on raw numpy arrays: contiguous stride-1 kernels
+    # without per-op Series/index overhead.
+    rp = num_cols["realized pnl"].to_numpy()
+    fe = num_cols["fee"].to_numpy()
+    rf = num_cols["realized funding"].to_numpy()
+    ch = num_cols["change"].to_numpy()
+
+    pnl_usd = np.where(is_trade, rp, 0.0)
+    fee_usd = np.where(is_trade, np.abs(fe), 0.0)
+    funding_usd = np.where(is_funding, np.where(rf != 0, rf, ch), 0.0)
+    net_usd = pnl_usd - fee_usd + funding_usd
+
+    # skip noise rows
+    keep = is_trade | is_funding | (np.abs(net_usd) >= 1e-12)
+
+    uid = col("uid").str.strip()
+    symbol = col("contract").where(col("contract") != "", col("symbol")).str.strip()
+    net_str = pd.Series(net_usd, index=df.index).astype(str)
+    trade_key = "KRAKENF|LOG|" + uid.where(
+        uid != "", dt_iso + "|" + symbol + "|" + net_str
+    )
+
+    out = pd.DataFrame({
+        "datetime": dt_iso,
+        "exchange": EX_KRAKEN,
+        "symbol": symbol,
+        "marketType": MKT_FUTURES,
+        "side": typ_raw.str.upper(),
+        "qty": 0.0,
+        "price": num_cols["trade price"],
+        "realizedPnlUsd": pnl_usd,
+        "feesUsd": fee_usd,
+        "fundingUsd": funding_usd,
+        "netPnlUsd": net_usd,
+        "notes": NOTES_KRAKEN,
+        "tradeKey": trade_key,
+    })
+    return out[keep].to_dict("records")
 
 
 def load_kraken_account_log_csv(path: Path) -> list[dict]:
@@ -103,35 +387,56 @@ def load_kraken_account_log_csv(path: Path) -> list[dict]:
         print(f"Kraken CSV not found: {path}")
         return []
 
+    if pd is not None:
+        return _load_kraken_account_log_pandas(path)
+    return _load_kraken_account_log_python(path)
+
+
+def _load_kraken_account_log_python(path: Path) -> list[dict]:
     rows = []
+    append_row = rows.append  # skip the method lookup per row
     with path.open("r", encoding="utf-8-sig", newline="") as f:
-        reader = csv.DictReader(f)
-        fieldnames = [c.strip() for c in (reader.fieldnames or [])]
-        lower_map = {c.lower(): c for c in fieldnames}
-
-        def get(row, key_lower):
-            k = lower_map.get(key_lower)
-            return row.get(k, "") if k else ""
+        reader = csv.reader(f)
+        header = next(reader, None) or []
+        # csv.reader hands back plain lists — no per-row dict allocation
+        # or hashed lookups like DictReader. Resolve each logical field
+        # to its column index once.
+        col_idx = {c.strip().lower(): i for i, c in enumerate(header)}
+        ncols = len(header)
+        # Missing columns point at a sentinel "" appended past the real
+        # cells, so one C-level itemgetter call extracts every field.
+        getter = itemgetter(*(
+            col_idx.get(name, ncols)
+            for name in (
+                "uid", "datetime", "type", "contract", "symbol",
+                "trade price", "realized pnl", "fee", "realized funding", "change",
+            )
+        ))
 
         for r in reader:
-            uid = get(r, "uid").strip()
-            dt = parse_kraken_dt(get(r, "datetime") or get(r, "dateTime"))
-            typ = (get(r, "type") or "").strip().lower()
-
-            symbol = (get(r, "contract") or get(r, "symbol") or "").strip()
-            trade_price = num(get(r, "trade price"))
-            realized_pnl = num(get(r, "realized pnl"))
-            fee = num(get(r, "fee"))
-            realized_funding = num(get(r, "realized funding"))
-            change = num(get(r, "change"))
+            if len(r) < ncols:
+                r += [""] * (ncols - len(r))
+            else:
+                del r[ncols:]  # drop spillover cells so the sentinel index holds
+            r.append("")  # sentinel read by missing/short columns
+            (uid, dt_str, raw_type, contract, symbol_cell,
+             price_cell, pnl_cell, fee_cell, funding_cell, change_cell) = getter(r)
+
+            uid = uid.strip()
+            dt = parse_kraken_dt(dt_str)
+            is_trade, is_funding, side = _classify_type(raw_type)
+
+            symbol = (contract or symbol_cell or "").strip()
+            trade_price = num(price_cell)
+            realized_pnl = num(pnl_cell)
+            fee = num(fee_cell)
+            realized_funding = num(funding_cell)
+            change = num(change_cell)
 
             funding_usd = 0.0
             pnl_usd = 0.0
             fee_usd = 0.0
 
-            is_trade = "futures trade" in typ
-            is_funding = "funding" in typ
-
             if is_trade:
                 pnl_usd = realized_pnl
                 fee_usd = abs(fee)
@@ -144,25 +449,28 @@ def load_kraken_account_log_csv(path: Path) -> list[dict]:
             if (not is_trade and not is_funding) and abs(net_usd) < 1e-12:
                 continue
 
-            trade_key = f"KRAKENF|LOG|{uid or (dt + '|' + symbol + '|' + str(net_usd))}"
+            if uid:
+                trade_key = "KRAKENF|LOG|" + uid
+            else:
+                trade_key = "|".join(("KRAKENF", "LOG", dt, symbol, str(net_usd)))
 
-            rows.append({
+            append_row({
                 "datetime": dt,
-                "exchange": "KRAKEN",
+                "exchange": EX_KRAKEN,
                 "symbol": symbol,
-                "marketType": "FUTURES",
-                "side": (get(r, "type") or "").upper(),
+                "marketType": MKT_FUTURES,
+                "side": side,
                 "qty": 0.0,
                 "price": trade_price,
                 "realizedPnlUsd": pnl_usd,
                 "feesUsd": fee_usd,
                 "fundingUsd": funding_usd,
                 "netPnlUsd": net_usd,
-                "notes": "Kraken Futures account-log",
+                "notes": NOTES_KRAKEN,
                 "tradeKey": trade_key,
             })
 
-    rows.sort(key=lambda x: x.get("datetime", ""))
+    sort_rows_by_datetime(rows)
     return rows
 
 
@@ -180,17 +488,9 @@ def parse_blofin_dt(dt_str: str) -> str:
         return now_utc_iso()
 
     try:
-        dt = datetime.strptime(s, "%m/%d/%Y %H:%M:%S")
-        dt = dt.replace(tzinfo=timezone.utc)
-        return dt.isoformat().replace("+00:00", "Z")
+        return _parse_dt_cached(s, _BLOFIN_SLASH_FMT)
     except Exception:
-        try:
-            dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=timezone.utc)
-            return dt.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
-        except Exception:
-            return now_utc_iso()
+        return now_utc_iso()
 
 
 def load_blofin_order_history_csv(path: Path) -> list[dict]:
@@ -199,66 +499,84 @@ def load_blofin_order_history_csv(path: Path) -> list[dict]:
         return []
 
     rows = []
+    append_row = rows.append  # skip the method lookup per row
     with path.open("r", encoding="utf-8-sig", newline="") as f:
-        reader = csv.DictReader(f)
-        # normalize headers
-        headers = [h.strip() for h in (reader.fieldnames or [])]
-        hmap = {h.lower(): h for h in headers}
-
-        def g(row, name):
-            key = hmap.get(name.lower())
-            return row.get(key, "") if key else ""
+        reader = csv.reader(f)
+        header = next(reader, None) or []
+        # Plain csv.reader lists plus integer indexing, like the Kraken
+        # loader — no per-row dict allocation or hashed lookups.
+        col_idx = {h.strip().lower(): i for i, h in enumerate(header)}
+        i_status = col_idx.get("status", -1)
+        i_pnl = col_idx.get("pnl", -1)
+        i_time = col_idx.get("order time", -1)
+        i_asset = col_idx.get("underlying asset", -1)
+        i_symbol = col_idx.get("symbol", -1)
+        i_side = col_idx.get("side", -1)
+        i_filled = col_idx.get("filled", -1)
+        i_avg_fill = col_idx.get("avg fill", -1)
+        i_price = col_idx.get("price", -1)
+        i_fee = col_idx.get("fee", -1)
+        i_options = col_idx.get("order options", -1)
+        i_order_id = col_idx.get("order id", -1)
+
+        def g(row, i):
+            return row[i] if 0 <= i < len(row) else ""
 
         for r in reader:
-            status = (g(r, "Status") or "").strip().lower()
+            status = (g(r, i_status) or "").strip().lower()
             if status and status != "filled":
                 continue
 
-            pnl_raw = (g(r, "PNL") or "").strip()
+            pnl_raw = (g(r, i_pnl) or "").strip()
             # Skip rows without realized pnl (Blofin sometimes uses --)
             if pnl_raw in ("", "--", "—"):
                 continue
 
-            dt = parse_blofin_dt(g(r, "Order Time"))
-            symbol = (g(r, "Underlying Asset") or g(r, "Symbol") or "").strip()
-            side_raw = (g(r, "Side") or "").strip()
-            side = "SELL" if "sell" in side_raw.lower() else "BUY"
+            dt = parse_blofin_dt(g(r, i_time))
+            symbol = (g(r, i_asset) or g(r, i_symbol) or "").strip()
+            side_raw = (g(r, i_side) or "").strip()
+            side = SIDE_SELL if "sell" in side_raw.lower() else SIDE_BUY
 
-            qty = num(g(r, "Filled"))
-            price = num(g(r, "Avg Fill")) or num(g(r, "Price"))
+            qty = num(g(r, i_filled))
+            price = num(g(r, i_avg_fill)) or num(g(r, i_price))
             pnl_usd = num(pnl_raw)  # usually USDT
-            fee_usd = abs(num(g(r, "Fee")))
+            fee_usd = abs(num(g(r, i_fee)))
             funding_usd = 0.0
             net_usd = pnl_usd - fee_usd + funding_usd
 
-            # Build a stable tradeKey from multiple fields
-            trade_key = f"BLOFIN|{g(r,'Order Time')}|{symbol}|{side_raw}|{qty}|{price}|{pnl_usd}|{fee_usd}"
+            # Build a stable tradeKey from multiple fields; one join
+            # instead of a chain of f-string interpolations
+            trade_key = "|".join((
+                "BLOFIN", g(r, i_time), symbol, side_raw,
+                str(qty), str(price), str(pnl_usd), str(fee_usd),
+            ))
 
-            notes = (g(r, "Order Options") or g(r, "Order ID") or "").strip()
+            notes = (g(r, i_options) or g(r, i_order_id) or "").strip()
 
-            rows.append({
+            append_row({
                 "datetime": dt,
-                "exchange": "BLOFIN",
+                "exchange": EX_BLOFIN,
                 "symbol": symbol,
-                "marketType": "FUTURES",
+                "marketType": MKT_FUTURES,
                 "side": side,
-                "qty": float(qty),
-                "price": float(price),
-                "realizedPnlUsd": float(pnl_usd),
-                "feesUsd": float(fee_usd),
-                "fundingUsd": float(funding_usd),
-                "netPnlUsd": float(net_usd),
-                "notes": notes or "Blofin order history",
+                "qty": qty,
+                "price": price,
+                "realizedPnlUsd": pnl_usd,
+                "feesUsd": fee_usd,
+                "fundingUsd": funding_usd,
+                "netPnlUsd": net_usd,
+                "notes": notes or NOTES_BLOFIN,
                 "tradeKey": trade_key,
             })
 
-    rows.sort(key=lambda x: x.get("datetime", ""))
+    sort_rows_by_datetime(rows)
     return rows
 
 
 # ------------------------------------------------------------
 # Optional API snapshot (Kraken Futures) — not required for Blofin CSV
 # ------------------------------------------------------------
+@functools.lru_cache(maxsize=4)
 def b64decode_secret(secret_b64: str) -> bytes:
     s = (secret_b64 or "").strip().replace(" ", "").replace("\n", "").replace("\r", "")
     pad = (-len(s)) % 4
@@ -267,31 +585,37 @@ def b64decode_secret(secret_b64: str) -> bytes:
     return base64.b64decode(s)
 
 
-def sign_request(secret_b64: str, path: str, nonce: str, postdata: str) -> str:
+def sign_request(secret_b64: str, path: str, nonce: str, postdata: str) -> bytes:
     secret = b64decode_secret(secret_b64)
-    msg = (postdata + nonce + path).encode("utf-8")
-    sig = hmac.new(secret, msg, hashlib.sha256).digest()
-    return base64.b64encode(sig).decode("utf-8")
+    msg = b"".join((postdata.encode("utf-8"), nonce.encode("utf-8"), path.encode("utf-8")))
+    # hmac.digest dispatches straight to OpenSSL's one-shot C path,
+    # skipping per-call HMAC object setup.
+    sig = hmac.digest(secret, msg, "sha256")
+    # requests accepts bytes header values, so skip the decode/re-encode
+    # round-trip the signature used to take on its way into the header.
+    return base64.b64encode(sig)
 
 
 def signed_get(key: str, secret_b64: str, endpoint_path: str, params: dict | None = None) -> dict:
     params = params or {}
     url = f"{BASE_URL}{API_PREFIX}{endpoint_path}"
-    nonce = str(int(time.time() * 1000))
+    nonce = str(time.time_ns() // 1_000_000)
     postdata = ""
     auth = sign_request(secret_b64, endpoint_path, nonce, postdata)
 
+    # Only the per-request auth headers go here; User-Agent/Accept live on
+    # the shared session.
     headers = {
         "APIKey": key,
         "Nonce": nonce,
         "Authent": auth,
-        "User-Agent": "pnl-traden-sync/1.0",
-        "Accept": "application/json",
     }
 
-    r = requests.get(url, params=params, headers=headers, timeout=TIMEOUT)
+    r = _SESSION.get(url, params=params, headers=headers, timeout=TIMEOUT)
     try:
-        data = r.json()
+        # orjson decodes the raw bytes directly; r.json() would go
+        # through stdlib json plus an encoding sniff.
+        data = orjson.loads(r.content) if orjson is not None else r.json()
     except Exception:
         data = {"raw": r.text}
     return {"status": r.status_code, "data": data}
@@ -334,19 +658,21 @@ def main():
     print(f"Reading Blofin order-history CSV: {blofin_csv}")
     blofin_rows = load_blofin_order_history_csv(blofin_csv)
 
-    # Merge + dedupe by tradeKey
+    # Merge + dedupe by tradeKey. Both loaders return rows already
+    # sorted by datetime, so a stable O(n) two-way merge replaces the
+    # concat + full resort.
     merged = []
     seen = set()
-    for r in (kraken_rows + blofin_rows):
-        k = r.get("tradeKey") or f"FALLBACK|{r.get('datetime')}|{r.get('exchange')}|{r.get('symbol')}|{r.get('netPnlUsd')}"
+    for r in heapq.merge(kraken_rows, blofin_rows, key=itemgetter("datetime")):
+        k = r.get("tradeKey")
+        if not k:
+            k = f"FALLBACK|{r.get('datetime')}|{r.get('exchange')}|{r.get('symbol')}|{r.get('netPnlUsd')}"
+            r["tradeKey"] = k
         if k in seen:
             continue
         seen.add(k)
-        r["tradeKey"] = k
         merged.append(r)
 
-    merged.sort(key=lambda x: x.get("datetime", ""))
-
     # Optional API snapshot (Kraken)
     key = os.getenv("KRAKEN_FUTURES_KEY", "").strip()
     secret = os.getenv("KRAKEN_FUTURES_SECRET", "").strip()
@@ -355,8 +681,19 @@ def main():
     accounts = {}
     if key and secret:
         print("Fetching Kraken API snapshot (open positions + accounts)...")
-        open_positions = fetch_open_positions(key, secret)
-        accounts = fetch_accounts(key, secret)
+        # Independent round-trips to the same host; run them in parallel
+        # so wallclock is the slower of the two, not the sum.
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            f_pos = ex.submit(fetch_open_positions, key, secret)
+            f_acc = ex.submit(fetch_accounts, key, secret)
+            try:
+                open_positions = f_pos.result()
+            except Exception as e:
+                print(f"Open positions fetch failed: {e}")
+            try:
+                accounts = f_acc.result()
+            except Exception as e:
+                print(f"Accounts fetch failed: {e}")
 
     write_json(
         merged,